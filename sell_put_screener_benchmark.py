@@ -0,0 +1,391 @@
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+import sell_put_screener
+from sell_put_screener import (
+    get_options_chain, calculate_metrics, screen_options, format_output
+)
+
+# Benchmark scales: (number of symbols, expiries per symbol, strikes per expiry)
+SCALES = {
+    'small': (1, 4, 40),
+    'medium': (5, 6, 80),
+    'large': (20, 8, 150),
+}
+
+RISK_FREE_RATE = 0.05
+
+# Strikes are listed between these fractions of spot, on one of these increments
+STRIKE_BAND = (0.6, 1.2)
+STRIKE_INCREMENTS = [0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0]
+
+CALIBRATION_FRAME = pd.DataFrame(np.random.default_rng(0).uniform(1, 100, (5000, 2)), columns=['a', 'b'])
+
+OptionChain = namedtuple('OptionChain', ['calls', 'puts'])
+
+
+def benchmark_config(expiries, strikes):
+    # Same shape as the default config, with the DTE window sized to the synthetic
+    # expiries and no result cap so the later stages scale with the chain
+    return {
+        "data": {"symbols": []},
+        "options_strategy": {
+            "max_dte": 15 + 7 * expiries,
+            "min_dte": 0,
+            "min_volume": 10,
+            "min_open_interest": 10
+        },
+        "screening_criteria": {
+            "min_annualized_return": 20,
+            "min_delta": -0.3,
+            "max_delta": -0.1
+        },
+        "output": {
+            "sort_by": ["annualized_return"],
+            "sort_order": "descending",
+            "max_results": expiries * strikes
+        }
+    }
+
+
+def generate_put_chain(symbol, expiry, dte, spot, strikes, rng):
+    """Build a yfinance-style puts DataFrame for one expiry"""
+    # Strike ladder inside 60%-120% of spot, using the widest standard increment
+    # that still fits all the strikes, centred in the band
+    low, high = spot * STRIKE_BAND[0], spot * STRIKE_BAND[1]
+    fitting = [inc for inc in STRIKE_INCREMENTS if (high - low) / inc >= strikes - 1]
+    if not fitting:
+        raise ValueError(f"Cannot fit {strikes} strikes between {low:.2f} and {high:.2f}")
+    increment = fitting[-1]
+    first = np.ceil(low / increment)
+    available = int(np.floor(high / increment) - first) + 1
+    ladder = np.round((first + (available - strikes) // 2 + np.arange(strikes)) * increment, 2)
+    assert low <= ladder[0] and ladder[-1] <= high, "strike ladder left the moneyness band"
+
+    # IV smile: put skew below spot plus curvature in both wings
+    T = dte / 365
+    moneyness = np.log(ladder / spot)
+    base_iv = rng.uniform(0.2, 0.8)
+    iv = base_iv - 0.8 * moneyness + 2.5 * moneyness ** 2 + rng.normal(0, 0.01, strikes)
+    iv = np.clip(iv, 0.05, 3.0)
+
+    # Black-Scholes put price
+    d1 = (np.log(spot / ladder) + (RISK_FREE_RATE + iv ** 2 / 2) * T) / (iv * np.sqrt(T))
+    d2 = d1 - iv * np.sqrt(T)
+    price = ladder * np.exp(-RISK_FREE_RATE * T) * norm.cdf(-d2) - spot * norm.cdf(-d1)
+    price = np.maximum(np.round(price, 2), 0.01)
+    spread = np.maximum(np.round(price * 0.05, 2), 0.01)
+
+    # Volume and open interest peak near the money and thin out in the wings
+    liquidity = np.exp(-(moneyness / 0.1) ** 2) * np.exp(-dte / 60)
+    volume = rng.poisson(2000 * liquidity + 1).astype(float)
+    volume[rng.random(strikes) < 0.1] = np.nan
+    open_interest = rng.poisson(8000 * liquidity + 5)
+
+    expiry_code = datetime.strptime(expiry, '%Y-%m-%d').strftime('%y%m%d')
+    return pd.DataFrame({
+        'contractSymbol': [f"{symbol}{expiry_code}P{int(k * 1000):08d}" for k in ladder],
+        'lastTradeDate': pd.Timestamp.now(tz='UTC'),
+        'strike': ladder,
+        'lastPrice': price,
+        'bid': np.maximum(price - spread, 0.0),
+        'ask': price + spread,
+        'change': 0.0,
+        'percentChange': 0.0,
+        'volume': volume,
+        'openInterest': open_interest,
+        'impliedVolatility': iv,
+        'inTheMoney': ladder > spot,
+        'contractSize': 'REGULAR',
+        'currency': 'USD',
+    })
+
+
+class SyntheticTicker:
+    """Stand-in for yfinance.Ticker serving pre-generated put chains"""
+
+    def __init__(self, spot, chains):
+        self.info = {'regularMarketPrice': spot}
+        self.options = tuple(chains)
+        self._chains = chains
+
+    def option_chain(self, date):
+        # get_options_chain adds columns to the puts frame, so hand out a copy
+        return OptionChain(calls=pd.DataFrame(), puts=self._chains[date].copy())
+
+
+def frozen_datetime(now):
+    """datetime subclass whose now() always returns the given moment"""
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now if tz is None else now.astimezone(tz)
+    return FrozenDatetime
+
+
+def generate_market(symbols, expiries, strikes, now, seed=0):
+    rng = np.random.default_rng(seed)
+    today = now.date()
+    market = {}
+    for n in range(symbols):
+        symbol = f"SYN{n:03d}"
+        spot = float(np.round(rng.lognormal(np.log(150), 0.8), 2))
+        chains = {}
+        for e in range(expiries):
+            # Weekly expiries starting two weeks out
+            dte = 14 + 7 * e
+            expiry = (today + timedelta(days=dte)).strftime('%Y-%m-%d')
+            chains[expiry] = generate_put_chain(symbol, expiry, dte, spot, strikes, rng)
+        market[symbol] = SyntheticTicker(spot, chains)
+    return market
+
+
+def calibration_pass():
+    # Fixed mix of pandas, numpy and pure-Python work used as a yardstick for
+    # how fast the machine is running at the moment
+    df = CALIBRATION_FRAME.copy()
+    df['x'] = np.log(df['a'] / df['b']) * df['a']
+    df = df[df['x'] > 0].sort_values('x')
+    df['s'] = df['a'].apply(lambda v: f"{v:.2f}")
+    return sum(len(v) for v in df['s'])
+
+
+def autorange(run_pass, min_sample):
+    # Double the passes per sample until a sample takes at least min_sample seconds
+    number = 1
+    while sum(run_pass()[0] for _ in range(number)) < min_sample:
+        number *= 2
+    return number
+
+
+def time_stage(calls, repeat, min_sample):
+    """Time one pass over calls, autoranging like timeit.
+
+    Each call is a (func, setup) pair; setup, if given, runs untimed before func
+    and its return value is passed to func. After an untimed warm-up pass, the
+    number of passes per sample is doubled until a sample takes at least
+    min_sample seconds. Every sample is followed by a sample of
+    calibration_pass, and the ratio between the two is recorded so that
+    comparisons are not thrown off by the machine speeding up or slowing down.
+    Returns the per-pass timings, the relative timings, the warm-up results and
+    the number of passes per sample.
+    """
+    def run_pass():
+        elapsed = 0.0
+        results = []
+        for func, setup in calls:
+            args = (setup(),) if setup else ()
+            start = time.perf_counter()
+            results.append(func(*args))
+            elapsed += time.perf_counter() - start
+        return elapsed, results
+
+    def run_calibration():
+        start = time.perf_counter()
+        calibration_pass()
+        return time.perf_counter() - start, None
+
+    _, results = run_pass()
+    number = autorange(run_pass, min_sample)
+    calibration_number = autorange(run_calibration, min_sample)
+    timings = []
+    relative = []
+    for _ in range(repeat):
+        elapsed = sum(run_pass()[0] for _ in range(number)) / number
+        calibration = sum(run_calibration()[0] for _ in range(calibration_number)) / calibration_number
+        timings.append(elapsed)
+        relative.append(elapsed / calibration)
+    return timings, relative, results, number
+
+
+def create_ui_window(config):
+    try:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from PyQt5.QtWidgets import QApplication
+        import sell_put_screener_ui
+    except ImportError as e:
+        print(f"Skipping UI table stage: {str(e)}")
+        return None, None
+    app = QApplication.instance() or QApplication(sys.argv)
+    # Avoid reading or creating config.json next to the application
+    with mock.patch.object(sell_put_screener_ui, 'load_config', return_value=config):
+        window = sell_put_screener_ui.OptionsScreenerUI()
+    return app, window
+
+
+def run_scale(symbols, expiries, strikes, repeat, min_sample, seed, now):
+    market = generate_market(symbols, expiries, strikes, now, seed)
+    config = benchmark_config(expiries, strikes)
+    config['data']['symbols'] = list(market)
+    prices = [ticker.info['regularMarketPrice'] for ticker in market.values()]
+    stages = {}
+
+    def summarise(timings, relative, rows, number):
+        return {
+            'min_seconds': min(timings),
+            'median_seconds': statistics.median(timings),
+            'min_relative': min(relative),
+            'median_relative': statistics.median(relative),
+            'rows': rows,
+            'passes_per_sample': number,
+        }
+
+    def record(stage, calls):
+        timings, relative, results, number = time_stage(calls, repeat, min_sample)
+        stages[stage] = summarise(timings, relative, sum(len(result) for result in results), number)
+        return results
+
+    # Pin the screener's clock to the one the market was generated with, so DTE
+    # filtering and calendar_days don't drift during a long run
+    with contextlib.redirect_stdout(io.StringIO()), \
+            mock.patch.object(sell_put_screener.yf, 'Ticker', side_effect=lambda s: market[s]), \
+            mock.patch.object(sell_put_screener, 'datetime', frozen_datetime(now)):
+        chains = record('get_options_chain', [
+            (functools.partial(get_options_chain, symbol, config), None) for symbol in market
+        ])
+        # calculate_metrics and screen_options modify their input in place
+        options = record('calculate_metrics', [
+            (functools.partial(calculate_metrics, current_price=price), chain.copy)
+            for chain, price in zip(chains, prices)
+        ])
+        filtered = record('screen_options', [
+            (functools.partial(screen_options, config=config), chain.copy) for chain in options
+        ])
+        formatted = record('format_output', [
+            (functools.partial(format_output, chain, price), None) for chain, price in zip(filtered, prices)
+        ])
+
+    # Populate the results table with every qualifying option across symbols
+    results = pd.concat(formatted)
+    app, window = create_ui_window(config)
+    if window is not None:
+        window.results['Benchmark'] = results
+        # display_results reports errors on the status bar instead of raising, so
+        # check an untimed call fills the table before timing it
+        window.display_results('Benchmark')
+        table = window.results_table
+        message = window.status_bar.currentMessage()
+        if not results.empty and (message.startswith('Error')
+                                  or table.item(table.rowCount() - 1, table.columnCount() - 1) is None):
+            raise RuntimeError(f"ui_table stage failed to populate the results table: {message}")
+        timings, relative, _, number = time_stage(
+            [(lambda: window.display_results('Benchmark'), None)], repeat, min_sample
+        )
+        stages['ui_table'] = summarise(timings, relative, table.rowCount(), number)
+        window.close()
+
+    return {
+        'symbols': symbols,
+        'expiries': expiries,
+        'strikes': strikes,
+        'stages': stages
+    }
+
+
+def compare_results(results, baseline, tolerance):
+    regressions = []
+    skipped = []
+    for scale in baseline.get('scales', {}):
+        if scale not in results['scales']:
+            skipped.append(f"{scale}: not run")
+    for scale, scale_result in results['scales'].items():
+        if scale not in baseline.get('scales', {}):
+            skipped.append(f"{scale}: not in baseline")
+            continue
+        baseline_stages = baseline['scales'][scale]['stages']
+        for stage in baseline_stages:
+            if stage not in scale_result['stages']:
+                skipped.append(f"{scale}/{stage}: not run")
+        for stage, stage_result in scale_result['stages'].items():
+            if stage not in baseline_stages:
+                skipped.append(f"{scale}/{stage}: not in baseline")
+                continue
+            before = baseline_stages[stage]
+            if stage_result['rows'] != before['rows']:
+                regressions.append(f"{scale}/{stage}: rows changed from {before['rows']} to {stage_result['rows']}")
+            # Compare times relative to the calibration workload, and only flag a
+            # slowdown seen in both the best and the typical sample
+            min_ratio = stage_result['min_relative'] / before['min_relative']
+            median_ratio = stage_result['median_relative'] / before['median_relative']
+            if min(min_ratio, median_ratio) > 1 + tolerance:
+                regressions.append(
+                    f"{scale}/{stage}: {before['min_seconds'] * 1000:.2f} ms -> "
+                    f"{stage_result['min_seconds'] * 1000:.2f} ms, {min_ratio:.2f}x min and "
+                    f"{median_ratio:.2f}x median relative to calibration"
+                )
+    return regressions, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the sell put screener pipeline on synthetic option chains")
+    parser.add_argument('--scales', nargs='+', choices=list(SCALES), default=list(SCALES),
+                        help="Scales to run (default: all)")
+    parser.add_argument('--repeat', type=int, default=10, help="Timed runs per stage (default: 10)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for the synthetic market (default: 0)")
+    parser.add_argument('--output', default='benchmark_results.json',
+                        help="Where to write the JSON results (default: benchmark_results.json)")
+    parser.add_argument('--baseline', help="Previous results JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help="Allowed slowdown of both the min and median time versus the baseline "
+                             "before failing (default: 0.5 = 50%%)")
+    parser.add_argument('--min-sample-seconds', type=float, default=0.05,
+                        help="Repeat fast stages until each timed sample takes at least this long (default: 0.05)")
+    args = parser.parse_args()
+
+    now = datetime.now()
+    results = {
+        'generated_at': now.isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'repeat': args.repeat,
+        'min_sample_seconds': args.min_sample_seconds,
+        'seed': args.seed,
+        'scales': {},
+    }
+    for scale in args.scales:
+        symbols, expiries, strikes = SCALES[scale]
+        print(f"Running {scale} scale: {symbols} symbols x {expiries} expiries x {strikes} strikes...")
+        results['scales'][scale] = run_scale(symbols, expiries, strikes, args.repeat,
+                                             args.min_sample_seconds, args.seed, now)
+        for stage, stage_result in results['scales'][scale]['stages'].items():
+            print(f"  {stage:<18} {stage_result['min_seconds'] * 1000:10.2f} ms  "
+                  f"{stage_result['min_relative']:8.2f}x calibration  {stage_result['rows']:>7} rows")
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=4)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions, skipped = compare_results(results, baseline, args.tolerance)
+        if skipped:
+            print("\nSkipped comparisons:")
+            for item in skipped:
+                print(f"  {item}")
+        if regressions:
+            print("\nRegressions against baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("No regressions against baseline.")
+
+
+if __name__ == '__main__':
+    main()